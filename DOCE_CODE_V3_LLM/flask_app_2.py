@@ -1,171 +1,365 @@
-from flask import Flask, request, jsonify
-import os
-from typing import Dict, Any
-from dotenv import load_dotenv
-from llm import LLM
-import utils
-import asyncio
-import logging
-from treesitter.treesitter_py import MultiLanguageParser
-from treesitter.code_search import CodeSearchEngine, SearchCodeElementsParams
-
-load_dotenv()
-
-app = Flask(__name__)
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Initialize CodeSearchEngine
-code_search_engine = CodeSearchEngine()
-
-def get_language_from_extension(file_path: str) -> str:
-    """Get the programming language based on the file extension."""
-    _, ext = os.path.splitext(file_path)
-    extension_to_language = {
-        '.py': 'python',
-        '.java': 'java',
-        '.cpp': 'cpp',
-        '.c': 'c',
-        '.h': 'c',
-        '.hpp': 'cpp',
-        '.js': 'javascript'
-    }
-    return extension_to_language.get(ext.lower(), 'unknown')
-
-def process(folder_path: str) -> Dict[str, Any]:
-    """
-    Process a folder to generate documentation.
-
-    Args:
-        folder_path (str): Path to the root folder
-
-    Returns:
-        Dict[str, Any]: Generated documentation and metadata
-    """
-    try:
-        # Initialize documentation storage
-        documentation = {}
-        file_count = 0
-        error_count = 0
-        
-        # Setup LLM
-        llm = LLM()
-        
-        # Walk through the folder
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                # Skip hidden files and directories
-                if any(part.startswith('.') for part in file_path.split(os.sep)):
-                    continue
-                
-                # Get language for the file
-                language = get_language_from_extension(file_path)
-                if language == 'unknown':
-                    logger.warning(f"Unsupported file extension for {file_path}")
-                    continue
-                
-                try:
-                    # Read file content
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Parse code using MultiLanguageParser
-                    parser = MultiLanguageParser(language)
-                    parsed_code = parser.parse(content)
-                    
-                    # Find similar code elements
-                    search_params = SearchCodeElementsParams(
-                        element_type=parsed_code.get('type'),
-                        keyword=content[:100],  # Use first 100 chars as search text
-                        index_name='code_elements'
-                    )
-                    similar_elements = code_search_engine.search_code_elements(**search_params.dict())
-                    
-                    doc_context = {
-                        'primary_element': parsed_code,
-                        'similar_elements': similar_elements,
-                        'combined_context': "\n".join([
-                            "Similar code patterns found:",
-                            *[f"- {elem['text']}" for elem in similar_elements[:3]]
-                        ])
-                    }
-                    
-                    doc_result = asyncio.run(llm.generate_structured_documentation(
-                        language=language,
-                        methods=parsed_code['functions'],
-                        context=doc_context
-                    ))
-                    
-                    if doc_result:
-                        relative_path = os.path.relpath(file_path, folder_path)
-                        documentation[relative_path] = {
-                            "language": language,
-                            "documentation": doc_result,
-                            "similar_patterns": [elem['text'] for elem in similar_elements[:3]]
-                        }
-                        file_count += 1
-                        logger.info(f"Processed file: {relative_path}")
-                    else:
-                        error_count += 1
-                        logger.warning(f"Failed to generate documentation for: {relative_path}")
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error processing {file_path}: {str(e)}")
-                    continue
-        
-        # Format and save documentation
-        formatted_docs = utils.CodeUtils.format_documentation(documentation)
-        output_dir = os.path.join(folder_path, 'documentation')
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, 'documentation.json')
-        
-        if utils.CodeUtils.save_documentation(formatted_docs, output_file):
-            logger.info(f"Documentation saved successfully to: {output_file}")
-            return {
-                "success": True,
-                "files_processed": file_count,
-                "errors": error_count,
-                "output_file": output_file,
-                "documentation": formatted_docs
-            }
-        else:
-            logger.error("Failed to save documentation")
-            return {
-                "success": False,
-                "error": "Failed to save documentation",
-                "files_processed": file_count,
-                "errors": error_count
-            }
-            
-    except Exception as e:
-        logger.error(f"Error processing folder: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e)
-        }
-
-@app.route('/generate-docs', methods=['POST'])
-def generate_documentation():
-    data = request.get_json()
-    if not data or 'folder_path' not in data:
-        return jsonify({'error': 'folder_path is required'}), 400
-
-    folder_path = data['folder_path']
-    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-        return jsonify({'error': 'Invalid folder path'}), 400
-
-    result = process(folder_path)
-
-    if result['success']:
-        return jsonify(result)
-    else:
-        return jsonify(result), 500
-
-@app.route('/health', methods=['GET'])
-def health_check():
+from flask import Flask, request, jsonify
+import os
+from typing import Dict, Any, Iterator
+from dotenv import load_dotenv
+from llm import LLM
+import utils
+import asyncio
+import logging
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from treesitter.treesitter_py import get_parser
+from treesitter.code_search import SearchCodeElementsParams
+from treesitter.parse_cache import ParseCache
+
+load_dotenv()
+
+app = Flask(__name__)
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache of parse results and generated docs keyed by (path, sha256(content))
+parse_cache = ParseCache()
+
+# Built once at import time; get_language_from_extension runs once per file
+_EXT_TO_LANG = {
+    'py': 'python',
+    'java': 'java',
+    'cpp': 'cpp',
+    'c': 'c',
+    'h': 'c',
+    'hpp': 'cpp',
+    'js': 'javascript'
+}
+
+def get_language_from_extension(file_path: str) -> str:
+    """Get the programming language based on the file extension."""
+    return _EXT_TO_LANG.get(file_path.rpartition('.')[2].lower(), 'unknown')
+
+# Directories that are never worth descending into
+_SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', 'venv', '.venv'})
+
+# Cap on concurrent Gemini requests, sized for the 500 requests/minute quota
+MAX_CONCURRENT_LLM_CALLS = 8
+
+# Number of files read, parsed and documented per pipeline batch; bounds
+# how much file content and parse output is in memory at once
+FILE_BATCH_SIZE = 64
+
+# Files at least this large are memory-mapped instead of read into a
+# bytes object; tree-sitter scans the mapping directly
+MMAP_THRESHOLD = 64 * 1024
+
+def build_search_keyword(parsed_code: Dict[str, Any], content: bytes) -> str:
+    """
+    Derive the BM25 search keyword from the parsed function and class names.
+
+    The file head is often a shebang, license comment or import block, so a
+    raw content snippet retrieves poor matches; identifier names make the
+    BM25 scores meaningful. Falls back to the first 100 chars only when the
+    parse yields no names.
+    """
+    names = []
+
+    for method in parsed_code.get('functions', []):
+        name = method.get('name') if isinstance(method, dict) else getattr(method, 'name', None)
+        if name:
+            names.append(name)
+
+    for class_info in parsed_code.get('classes', []):
+        if class_info.get('name'):
+            names.append(class_info['name'])
+
+    if names:
+        return " ".join(names)
+    # Decode only the 100-byte snippet actually used as search text
+    return content[:100].decode('utf-8', 'replace')
+
+def read_and_parse(file_path: str, relative_path: str, language: str) -> Dict[str, Any]:
+    """
+    Read and parse one file, consulting the parse cache first.
+
+    Runs inside the thread pool: file I/O and tree-sitter's parse both
+    release the GIL, so workers overlap for real. Large files are
+    memory-mapped so their bytes are never copied into the heap.
+    """
+    # Read raw bytes; tree-sitter parses bytes, so decoding the whole file
+    # to str and re-encoding it would be a wasted round-trip
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return parse_content(file_path, relative_path, language, content)
+        content = f.read()
+
+    return parse_content(file_path, relative_path, language, content)
+
+def parse_content(file_path: str, relative_path: str, language: str, content) -> Dict[str, Any]:
+    """Hash, cache-check and parse one file's content (bytes or mmap)."""
+    # Check the cache before re-parsing unchanged bytes
+    sha = ParseCache.content_sha(content)
+    cached = parse_cache.get(file_path, sha)
+
+    if cached and cached['doc']:
+        # Warm hit: reuse the full cached doc, skip ES and LLM
+        return {
+            'file_path': file_path,
+            'relative_path': relative_path,
+            'language': language,
+            'sha': sha,
+            'cached_doc': cached['doc']
+        }
+
+    if cached and cached['parsed']:
+        parsed_code = cached['parsed']
+    else:
+        # Parse code using this thread's per-language parser; ParseCache
+        # already stores this extraction by (path, sha), so skip the
+        # parser's own AstCache rather than hashing and pickling twice
+        parsed_code = get_parser(language).parse(content, use_cache=False)
+        parse_cache.store_parsed(file_path, sha, parsed_code)
+
+    return {
+        'file_path': file_path,
+        'relative_path': relative_path,
+        'language': language,
+        'sha': sha,
+        'parsed_code': parsed_code,
+        'keyword': build_search_keyword(parsed_code, content)
+    }
+
+def iter_code_files(folder_path: str) -> Iterator[tuple]:
+    """
+    Stream (file_path, relative_path, language) for each supported file.
+
+    A generator keeps the walk lazy, so only one batch of files is held in
+    memory at a time instead of the whole repo's worth of paths and content.
+    """
+    for root, dirs, files in os.walk(folder_path):
+        # Prune hidden and known-noisy directories so the walk never
+        # descends into them
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in _SKIP_DIRS]
+
+        for file in files:
+            # Whitelist check on the bare name before any path join,
+            # logging or stat; non-source files cost nothing here
+            if '.' not in file or file.startswith('.'):
+                continue
+
+            language = _EXT_TO_LANG.get(file.rpartition('.')[2].lower())
+            if language is None:
+                continue
+
+            file_path = os.path.join(root, file)
+            yield file_path, os.path.relpath(file_path, folder_path), language
+
+def collect_file_entries(targets: list, executor: ThreadPoolExecutor) -> tuple:
+    """
+    Read and parse one batch of walk targets in parallel.
+
+    Args:
+        targets (list): (file_path, relative_path, language) tuples
+        executor (ThreadPoolExecutor): Pool running read_and_parse workers
+
+    Returns:
+        tuple: (List of entry dicts ready for the LLM stage, error count)
+    """
+    entries = []
+    error_count = 0
+
+    futures = [executor.submit(read_and_parse, *target) for target in targets]
+    for target, future in zip(targets, futures):
+        try:
+            entries.append(future.result())
+        except Exception as e:
+            error_count += 1
+            logger.error("Error processing %s: %s", target[0], e)
+
+    return entries, error_count
+
+async def process_entries(llm: LLM, entries: list, semaphore: asyncio.Semaphore) -> tuple:
+    """
+    Run the ES search and LLM stage for one batch of prepared entries.
+
+    Returns:
+        tuple: (documentation dict for the batch, files processed, errors)
+    """
+    documentation = {}
+    file_count = 0
+    error_count = 0
+
+    # Serve cached docs immediately; only uncached entries hit the LLM
+    pending = []
+    for entry in entries:
+        if 'cached_doc' in entry:
+            documentation[entry['relative_path']] = entry['cached_doc']
+            file_count += 1
+            logger.info("Processed file (cached): %s", entry['relative_path'])
+        else:
+            pending.append(entry)
+    entries = pending
+
+    # Find similar code elements for the whole batch in one msearch
+    # round-trip on the pooled async client
+    if entries:
+        param_list = [SearchCodeElementsParams(
+            element_type=entry['parsed_code'].get('type'),
+            keyword=entry['keyword'],
+            index_name='code_elements'
+        ) for entry in entries]
+
+        similar_results = await llm.code_search.search_code_elements_bulk(param_list)
+        for entry, similar_elements in zip(entries, similar_results):
+            entry['similar_elements'] = similar_elements
+
+    async def generate_docs_for_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        doc_context = {
+            'primary_element': entry['parsed_code'],
+            'similar_elements': entry['similar_elements'],
+            'combined_context': "\n".join([
+                "Similar code patterns found:",
+                *[f"- {elem['text']}" for elem in entry['similar_elements'][:3]]
+            ])
+        }
+        async with semaphore:
+            return await llm.generate_structured_documentation(
+                language=entry['language'],
+                methods=entry['parsed_code']['functions'],
+                context=doc_context
+            )
+
+    doc_results = await asyncio.gather(
+        *[generate_docs_for_entry(entry) for entry in entries],
+        return_exceptions=True
+    )
+
+    for entry, doc_result in zip(entries, doc_results):
+        relative_path = entry['relative_path']
+        if isinstance(doc_result, Exception):
+            error_count += 1
+            logger.error("Error processing %s: %s", entry['file_path'], doc_result)
+        elif doc_result:
+            documentation[relative_path] = {
+                "language": entry['language'],
+                "documentation": doc_result,
+                "similar_patterns": [elem['text'] for elem in entry['similar_elements'][:3]]
+            }
+            parse_cache.store_doc(entry['file_path'], entry['sha'], documentation[relative_path])
+            file_count += 1
+            logger.info("Processed file: %s", relative_path)
+        else:
+            error_count += 1
+            logger.warning("Failed to generate documentation for: %s", relative_path)
+
+    return documentation, file_count, error_count
+
+async def process_async(folder_path: str) -> Dict[str, Any]:
+    """
+    Process a folder to generate documentation.
+
+    Files are streamed from the walk in bounded batches: each batch is
+    read/parsed in the thread pool, searched with one msearch, then its
+    LLM calls run concurrently behind the shared semaphore. Only the
+    resulting docs are kept across batches, so memory stays proportional
+    to the batch size rather than the repo size.
+
+    Args:
+        folder_path (str): Path to the root folder
+
+    Returns:
+        Dict[str, Any]: Generated documentation and metadata
+    """
+    llm = None
+    try:
+        # Documentation accumulated across batches (docs only, no content)
+        documentation = {}
+        file_count = 0
+        error_count = 0
+
+        # Setup LLM
+        llm = LLM()
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+        async def run_batch(batch):
+            nonlocal file_count, error_count
+            entries, read_errors = collect_file_entries(batch, executor)
+            error_count += read_errors
+            batch_docs, batch_files, batch_errors = await process_entries(llm, entries, semaphore)
+            documentation.update(batch_docs)
+            file_count += batch_files
+            error_count += batch_errors
+
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as executor:
+            batch = []
+            for target in iter_code_files(folder_path):
+                batch.append(target)
+                if len(batch) >= FILE_BATCH_SIZE:
+                    await run_batch(batch)
+                    batch = []
+
+            if batch:
+                await run_batch(batch)
+
+        # Format and save documentation
+        formatted_docs = utils.CodeUtils.format_documentation(documentation)
+        output_dir = os.path.join(folder_path, 'documentation')
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, 'documentation.json')
+        
+        if utils.CodeUtils.save_documentation(formatted_docs, output_file):
+            logger.info("Documentation saved successfully to: %s", output_file)
+            return {
+                "success": True,
+                "files_processed": file_count,
+                "errors": error_count,
+                "output_file": output_file,
+                "documentation": formatted_docs
+            }
+        else:
+            logger.error("Failed to save documentation")
+            return {
+                "success": False,
+                "error": "Failed to save documentation",
+                "files_processed": file_count,
+                "errors": error_count
+            }
+            
+    except Exception as e:
+        logger.error("Error processing folder: %s", e)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    finally:
+        # The search client belongs to this request's event loop; close it
+        # before asyncio.run tears the loop down
+        if llm is not None:
+            await llm.code_search.close()
+
+def process(folder_path: str) -> Dict[str, Any]:
+    """Run the async documentation pipeline from synchronous callers."""
+    return asyncio.run(process_async(folder_path))
+
+@app.route('/generate-docs', methods=['POST'])
+def generate_documentation():
+    data = request.get_json()
+    if not data or 'folder_path' not in data:
+        return jsonify({'error': 'folder_path is required'}), 400
+
+    folder_path = data['folder_path']
+    if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
+        return jsonify({'error': 'Invalid folder path'}), 400
+
+    result = process(folder_path)
+
+    if result['success']:
+        return jsonify(result)
+    else:
+        return jsonify(result), 500
+
+@app.route('/health', methods=['GET'])
+def health_check():
     return jsonify({'status': 'healthy'})
\ No newline at end of file
@@ -1,252 +1,383 @@
-import os
-from typing import Dict, List, Any, Optional
-from dotenv import load_dotenv
-from langchain.tools import Tool
-from langchain.graphs import StateGraph
-import google.generativeai as genai
-import json
-from treesitter.code_search import CodeSearchEngine
-
-load_dotenv()
-
-class LLM:
-    def __init__(
-        self,
-        api_key: str = None,
-        model: str = "gemini-pro",
-        max_tokens: int = 1000,
-        max_retries: int = 3,
-        retry_delay: int = 1
-    ):
-        # Initialize Gemini
-        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not provided and not found in environment")
-        self.code_search = self.CodeSearchEngine()
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
-
-        # Initialize code search engine
-        self.code_search = CodeSearchEngine()
-
-        # Setup langchain workflow
-        self.setup_workflow()
-
-    def setup_workflow(self):
-        """Setup the documentation generation workflow using langchain."""
-        self.workflow = StateGraph(name="Documentation Generation")
-
-        # Define workflow states
-        self.workflow.add_state("identify_language")
-        self.workflow.add_state("parse_code")
-        self.workflow.add_state("search_similar_code")
-        self.workflow.add_state("generate_docs")
-        self.workflow.add_state("format_output")
-
-        # Define tools
-        self.tools = [
-            Tool(
-                name="identify_language",
-                func=self._identify_language_tool,
-                description="Identify the programming language of a code file"
-            ),
-            Tool(
-                name="search_similar_code",
-                func=self._search_similar_code_tool,
-                description="Search for similar code patterns"
-            ),
-            Tool(
-                name="generate_documentation",
-                func=self._generate_documentation_tool,
-                description="Generate documentation for code"
-            )
-        ]
-
-        # Define transitions
-        self.workflow.add_edge("identify_language", "parse_code")
-        self.workflow.add_edge("parse_code", "search_similar_code")
-        self.workflow.add_edge("search_similar_code", "generate_docs")
-        self.workflow.add_edge("generate_docs", "format_output")
-
-    def _identify_language_tool(self, file_path: str) -> Dict[str, str]:
-        """Tool to identify programming language from file path."""
-        if file_path.endswith('.py'):
-            return {"language": "python"}
-        elif file_path.endswith('.java'):
-            return {"language": "java"}
-        elif file_path.endswith(('.cpp', '.hpp')):
-            return {"language": "cpp"}
-        elif file_path.endswith(('.c', '.h')):
-            return {"language": "c"}
-        return {"language": "unknown"}
-
-    def _search_similar_code_tool(self, code: str) -> List[Dict]:
-        """Tool to search for similar code patterns."""
-        return self.code_search.search_code_elements(keyword=code)
-
-    def _generate_documentation_tool(self, code: str, language: str) -> Dict[str, Any]:
-        """Tool to generate documentation for code using Gemini Pro."""
-        try:
-            prompt = self._create_documentation_prompt(code, language)
-            response = self.model.generate_content(prompt)
-
-            if response.text:
-                return self._structure_documentation(response.text)
-            else:
-                return {"error": "Failed to generate documentation"}
-
-        except Exception as e:
-            print(f"Documentation generation error: {str(e)}")
-            return {"error": str(e)}
-
-    def _create_documentation_prompt(self, code: str, language: str) -> str:
-        """Create a prompt for documentation generation."""
-        return f"""
-        Generate comprehensive documentation for the following {language} code:
-
-        {code}
-
-        Please include:
-        1. Overall purpose and functionality
-        2. Detailed method/function descriptions
-        3. Parameters and return values
-        4. Usage examples
-        5. Dependencies and requirements
-        6. Any important notes or warnings
-
-        Format the documentation in a clear, structured manner.
-        Focus on:
-        - Clear explanations of complex logic
-        - Accurate parameter descriptions
-        - Real-world usage examples
-        - Common pitfalls or edge cases
-        - Best practices and optimization tips
-
-        Return the documentation in a structured format that separates different sections.
-        """
-
-    def _structure_documentation(self, raw_docs: str) -> Dict[str, Any]:
-        """Structure raw documentation into a standardized format."""
-        sections = raw_docs.split('\n\n')
-
-        structured_docs = {
-            "overview": "",
-            "methods": [],
-            "examples": [],
-            "dependencies": [],
-            "notes": []
-        }
-
-        current_section = None
-
-        for section in sections:
-            if section.lower().startswith(('overview', 'purpose')):
-                structured_docs["overview"] = section
-            elif section.lower().startswith(('method', 'function')):
-                structured_docs["methods"].append(section)
-            elif section.lower().startswith('example'):
-                structured_docs["examples"].append(section)
-            elif section.lower().startswith('dependen'):
-                structured_docs["dependencies"].append(section)
-            elif section.lower().startswith(('note', 'warning')):
-                structured_docs["notes"].append(section)
-
-        return structured_docs
-
-    async def generate_documentation(self, code: str, language: str) -> Dict[str, Any]:
-        """Generate documentation using the workflow."""
-        try:
-            # Execute the workflow
-            state = {"code": code, "language": language}
-
-            # Identify language
-            lang_result = self._identify_language_tool(state["language"])
-            state["detected_language"] = lang_result["language"]
-
-            # Search for similar code
-            similar_code = self._search_similar_code_tool(state["code"])
-            state["similar_patterns"] = similar_code
-
-            # Generate documentation
-            docs = self._generate_documentation_tool(
-                code=state["code"],
-                language=state["detected_language"]
-            )
-
-            if "error" in docs:
-                return {
-                    "success": False,
-                    "error": docs["error"]
-                }
-
-            return {
-                "success": True,
-                "documentation": docs,
-                "similar_patterns": state["similar_patterns"],
-                "language": state["detected_language"]
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-    def save_documentation(self, documentation: Dict[str, Any], output_file: str) -> bool:
-        """Save the generated documentation to a JSON file."""
-        try:
-            with open(output_file, 'w') as f:
-                json.dump(documentation, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"Error saving documentation: {str(e)}")
-            return False
-
-    async def generate_structured_documentation(self, language: str, methods: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Generate structured documentation for the given methods and context.
-
-        Args:
-            language (str): Programming language
-            methods (List[Dict[str, Any]]): List of parsed methods
-            context (Dict[str, Any]): Additional context for documentation generation
-
-        Returns:
-            Dict[str, Any]: Structured documentation
-        """
-        try:
-            combined_code = "\n\n".join([method.get('method_source_code', '') for method in methods])
-            prompt = self._create_documentation_prompt(combined_code, language)
-            
-            # Add context information to the prompt
-            prompt += f"\n\nAdditional context:\n{json.dumps(context, indent=2)}"
-
-            response = self.model.generate_content(prompt)
-
-            if response.text:
-                structured_docs = self._structure_documentation(response.text)
-                
-                # Add method-specific documentation
-                structured_docs['methods'] = []
-                for method in methods:
-                    method_doc = self._generate_documentation_tool(method.get('method_source_code', ''), language)
-                    structured_docs['methods'].append({
-                        'name': method.get('name', ''),
-                        'documentation': method_doc
-                    })
-
-                return {
-                    "success": True,
-                    "documentation": structured_docs
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Failed to generate documentation"
-                }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
+import os
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Any, Optional
+from dotenv import load_dotenv
+import google.generativeai as genai
+import json
+import orjson
+from treesitter.code_search import CodeSearchEngine
+
+load_dotenv()
+
+# Maps section heading prefixes to the structured-doc bucket they land in;
+# built once so _structure_documentation avoids a chain of startswith calls
+_SECTION_PREFIXES = (
+    ('overview', 'overview'),
+    ('purpose', 'overview'),
+    ('method', 'methods'),
+    ('function', 'methods'),
+    ('example', 'examples'),
+    ('dependen', 'dependencies'),
+    ('note', 'notes'),
+    ('warning', 'notes'),
+)
+
+def _json_default(obj: Any) -> Any:
+    """Encode dataclass method nodes when a context dict is dumped as JSON."""
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _method_field(method: Any, field: str, default: str = '') -> Any:
+    """
+    Read a field from a parsed method, dict or TreesitterMethodNode alike.
+
+    The tree-sitter pipeline hands methods over as dataclass instances
+    while cached or Java-parsed entries arrive as plain dicts; callers in
+    this module must accept both shapes.
+    """
+    if isinstance(method, dict):
+        return method.get(field, default)
+    return getattr(method, field, default)
+
+class LLM:
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = "gemini-pro",
+        max_tokens: int = 1000,
+        max_retries: int = 3,
+        retry_delay: int = 1
+    ):
+        # Initialize Gemini
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not provided and not found in environment")
+        genai.configure(api_key=self.api_key)
+        self.model = genai.GenerativeModel('gemini-pro')
+
+        # Initialize code search engine
+        self.code_search = CodeSearchEngine()
+
+        # Prompt text is constant per language; building each prefix once
+        # avoids re-assembling the template per call and keeps the prefix
+        # byte-identical across files so backend prompt caching can match
+        self._prompt_prefixes = {}
+        self._structured_prompt_prefixes = {}
+
+    def _identify_language_tool(self, file_path: str) -> Dict[str, str]:
+        """Tool to identify programming language from file path."""
+        if file_path.endswith('.py'):
+            return {"language": "python"}
+        elif file_path.endswith('.java'):
+            return {"language": "java"}
+        elif file_path.endswith(('.cpp', '.hpp')):
+            return {"language": "cpp"}
+        elif file_path.endswith(('.c', '.h')):
+            return {"language": "c"}
+        return {"language": "unknown"}
+
+    async def _search_similar_code_tool(self, code: str) -> List[Dict]:
+        """Tool to search for similar code patterns."""
+        return await self.code_search.search_code_elements(keyword=code)
+
+    def _generate_documentation_tool(self, code: str, language: str) -> Dict[str, Any]:
+        """Tool to generate documentation for code using Gemini Pro."""
+        try:
+            prompt = self._create_documentation_prompt(code, language)
+            response = self.model.generate_content(prompt)
+
+            if response.text:
+                return self._structure_documentation(response.text)
+            else:
+                return {"error": "Failed to generate documentation"}
+
+        except Exception as e:
+            print(f"Documentation generation error: {str(e)}")
+            return {"error": str(e)}
+
+    def _create_documentation_prompt(self, code: str, language: str) -> str:
+        """Create a prompt for documentation generation."""
+        # The instruction block goes before the code so the constant prefix
+        # stays identical across files for backend prompt caching
+        prefix = self._prompt_prefixes.get(language)
+        if prefix is None:
+            prefix = self._prompt_prefixes[language] = f"""
+        Generate comprehensive documentation for the {language} code below.
+
+        Please include:
+        1. Overall purpose and functionality
+        2. Detailed method/function descriptions
+        3. Parameters and return values
+        4. Usage examples
+        5. Dependencies and requirements
+        6. Any important notes or warnings
+
+        Format the documentation in a clear, structured manner.
+        Focus on:
+        - Clear explanations of complex logic
+        - Accurate parameter descriptions
+        - Real-world usage examples
+        - Common pitfalls or edge cases
+        - Best practices and optimization tips
+
+        Return the documentation in a structured format that separates different sections.
+
+        Code:
+
+        """
+        return prefix + code
+
+    def _structure_documentation(self, raw_docs: str) -> Dict[str, Any]:
+        """Structure raw documentation into a standardized format."""
+        sections = raw_docs.split('\n\n')
+
+        structured_docs = {
+            "overview": "",
+            "methods": [],
+            "examples": [],
+            "dependencies": [],
+            "notes": []
+        }
+
+        for section in sections:
+            # Lowercase only the head once instead of the whole section
+            # per startswith check
+            head = section[:10].lower()
+            for prefix, bucket in _SECTION_PREFIXES:
+                if head.startswith(prefix):
+                    if bucket == "overview":
+                        structured_docs["overview"] = section
+                    else:
+                        structured_docs[bucket].append(section)
+                    break
+
+        return structured_docs
+
+    async def generate_documentation(self, code: str, language: str) -> Dict[str, Any]:
+        """Generate documentation using the workflow."""
+        try:
+            # Execute the workflow
+            state = {"code": code, "language": language}
+
+            # Identify language
+            lang_result = self._identify_language_tool(state["language"])
+            state["detected_language"] = lang_result["language"]
+
+            # Search for similar code
+            similar_code = await self._search_similar_code_tool(state["code"])
+            state["similar_patterns"] = similar_code
+
+            # Generate documentation
+            docs = self._generate_documentation_tool(
+                code=state["code"],
+                language=state["detected_language"]
+            )
+
+            if "error" in docs:
+                return {
+                    "success": False,
+                    "error": docs["error"]
+                }
+
+            return {
+                "success": True,
+                "documentation": docs,
+                "similar_patterns": state["similar_patterns"],
+                "language": state["detected_language"]
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def save_documentation(self, documentation: Dict[str, Any], output_file: str) -> bool:
+        """Save the generated documentation to a JSON file."""
+        try:
+            # orjson serializes straight to bytes, far faster than
+            # json.dump with indent=2 on large doc dicts
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(documentation, option=orjson.OPT_INDENT_2))
+            return True
+        except Exception as e:
+            print(f"Error saving documentation: {str(e)}")
+            return False
+
+    def _create_batch_documentation_prompt(self, methods: List[Dict[str, Any]], language: str) -> str:
+        """Create a single prompt documenting several methods at once."""
+        method_blocks = []
+        for i, method in enumerate(methods, start=1):
+            name = _method_field(method, 'name') or f'method_{i}'
+            source = _method_field(method, 'method_source_code')
+            method_blocks.append(f"### METHOD {i}: {name}\n{source}")
+
+        return f"""
+        Generate documentation for each of the following {language} methods.
+
+        {chr(10).join(method_blocks)}
+
+        For every method above, describe its purpose, parameters, return value
+        and any important notes or edge cases.
+
+        Return ONLY a JSON array with one object per method, in the same order,
+        each shaped like:
+        {{"name": "<method name>", "documentation": "<documentation text>"}}
+        """
+
+    @staticmethod
+    def _parse_json_response(raw_text: str) -> Optional[Any]:
+        """Parse a JSON payload from a model response, tolerating code fences."""
+        text = raw_text.strip()
+        # Strip a markdown code fence if the model wrapped the JSON in one
+        if text.startswith('```'):
+            text = text.strip('`')
+            if text.startswith('json'):
+                text = text[4:]
+
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    @classmethod
+    def _parse_batch_response(cls, raw_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Parse the JSON array returned by a batched documentation prompt."""
+        parsed = cls._parse_json_response(raw_text)
+        if isinstance(parsed, list):
+            return parsed
+        return None
+
+    def _create_structured_documentation_prompt(self, code: str, language: str) -> str:
+        """Create a single prompt asking for overview and per-method docs as JSON."""
+        prefix = self._structured_prompt_prefixes.get(language)
+        if prefix is None:
+            prefix = self._structured_prompt_prefixes[language] = f"""
+        Generate comprehensive documentation for the {language} code below.
+
+        Return ONLY a JSON object shaped like:
+        {{
+          "overview": "<overall purpose and functionality>",
+          "methods": [
+            {{"name": "<method name>", "description": "...", "params": "...", "returns": "...", "examples": "..."}}
+          ],
+          "examples": ["<usage example>"],
+          "dependencies": ["<dependency or requirement>"],
+          "notes": ["<important note or warning>"]
+        }}
+
+        Include one entry in "methods" for every method or function in the code.
+        Focus on clear explanations, accurate parameter descriptions and
+        common pitfalls or edge cases.
+
+        Code:
+
+        """
+        return prefix + code
+
+    @classmethod
+    def _parse_structured_response(cls, raw_text: str) -> Optional[Dict[str, Any]]:
+        """Parse the JSON object returned by the structured documentation prompt."""
+        parsed = cls._parse_json_response(raw_text)
+        if not isinstance(parsed, dict):
+            return None
+
+        return {
+            "overview": parsed.get("overview", ""),
+            "methods": parsed.get("methods"),
+            "examples": parsed.get("examples", []),
+            "dependencies": parsed.get("dependencies", []),
+            "notes": parsed.get("notes", [])
+        }
+
+    async def _generate_batch_method_docs(self, methods: List[Dict[str, Any]], language: str, batch_size: int = 8) -> List[Dict[str, Any]]:
+        """
+        Document methods in marshaled batches instead of one call per method.
+
+        Args:
+            methods (List[Dict[str, Any]]): List of parsed methods
+            language (str): Programming language
+            batch_size (int): Maximum number of methods per prompt
+
+        Returns:
+            List[Dict[str, Any]]: One {name, documentation} entry per method
+        """
+        method_docs = []
+
+        for start in range(0, len(methods), batch_size):
+            batch = methods[start:start + batch_size]
+            prompt = self._create_batch_documentation_prompt(batch, language)
+            response = await self.model.generate_content_async(prompt)
+
+            parsed = self._parse_batch_response(response.text) if response.text else None
+            if parsed:
+                docs_by_name = {entry.get('name'): entry.get('documentation') for entry in parsed}
+                for i, method in enumerate(batch):
+                    name = _method_field(method, 'name')
+                    documentation = docs_by_name.get(name)
+                    if documentation is None and i < len(parsed):
+                        # Fall back to positional matching if the name differs
+                        documentation = parsed[i].get('documentation')
+                    method_docs.append({
+                        'name': name,
+                        'documentation': documentation or {}
+                    })
+            else:
+                # Batch response was unusable; fall back to per-method calls
+                for method in batch:
+                    method_doc = self._generate_documentation_tool(_method_field(method, 'method_source_code'), language)
+                    method_docs.append({
+                        'name': _method_field(method, 'name'),
+                        'documentation': method_doc
+                    })
+
+        return method_docs
+
+    async def generate_structured_documentation(self, language: str, methods: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate structured documentation for the given methods and context.
+
+        Args:
+            language (str): Programming language
+            methods (List[Dict[str, Any]]): List of parsed methods
+            context (Dict[str, Any]): Additional context for documentation generation
+
+        Returns:
+            Dict[str, Any]: Structured documentation
+        """
+        try:
+            combined_code = "\n\n".join([_method_field(method, 'method_source_code') for method in methods])
+            prompt = self._create_structured_documentation_prompt(combined_code, language)
+
+            # Add context information to the prompt
+            # The context carries TreesitterMethodNode dataclasses inside
+            # the parse dict; the default hook converts them for json
+            prompt += f"\n\nAdditional context:\n{json.dumps(context, indent=2, default=_json_default)}"
+
+            response = await self.model.generate_content_async(prompt)
+
+            if response.text:
+                structured_docs = self._parse_structured_response(response.text)
+
+                if structured_docs is None or structured_docs.get('methods') is None:
+                    # Fallback only: free-form overview plus batched
+                    # per-method calls when the JSON cannot be used
+                    structured_docs = self._structure_documentation(response.text)
+                    structured_docs['methods'] = await self._generate_batch_method_docs(methods, language)
+
+                return {
+                    "success": True,
+                    "documentation": structured_docs
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": "Failed to generate documentation"
+                }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
             }
\ No newline at end of file
@@ -1,11 +1,19 @@
-from flask_app import app
-
-def main():
-    # Run the command line application
-    app.run(host="0.0.0.0", port=5000)
-
-if __name__ == "__main__":
-    # Run the Flask app in a separate process
-    print("Flask server is running on http://127.0.0.1:5000")
-    main()
-    print("Flask server stopped.")
\ No newline at end of file
+import os
+
+def main():
+    # Hand the process over to gunicorn: the Flask dev server is single
+    # threaded, so one /generate-docs request blocked the whole server for
+    # the duration of the run. process() is I/O-bound (LLM + ES), so the
+    # gthread worker class with a few threads per worker fits best.
+    os.execvp("gunicorn", [
+        "gunicorn",
+        "-w", str(os.cpu_count() or 1),
+        "-k", "gthread",
+        "--threads", "4",
+        "-b", "0.0.0.0:5000",
+        "flask_app_2:app",
+    ])
+
+if __name__ == "__main__":
+    print("Starting gunicorn on http://0.0.0.0:5000")
+    main()
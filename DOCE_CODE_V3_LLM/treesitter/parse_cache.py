@@ -0,0 +1,146 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+class AstCache:
+    """
+    SQLite-backed cache of extraction dicts keyed by (language, sha256(code)).
+
+    Unlike ParseCache, which ties entries to a file path, this cache sits
+    directly under MultiLanguageParser.parse so any caller re-parsing the
+    same bytes gets the stored extraction back for the cost of a hash and
+    one SELECT.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv("AST_CACHE_DB", "ast_cache.db")
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        # WAL with relaxed syncing keeps cache writes off the parse path
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ast_cache ("
+            "lang TEXT, hash BLOB, blob BLOB, "
+            "PRIMARY KEY(lang, hash))"
+        )
+        self.conn.commit()
+
+    def get(self, language: str, sha: bytes) -> Optional[Dict[str, Any]]:
+        """Look up a cached extraction dict, or None on a miss."""
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT blob FROM ast_cache WHERE lang=? AND hash=?",
+                    (language, sha)
+                ).fetchone()
+
+            if not row:
+                return None
+            return pickle.loads(row[0])
+
+        except Exception as e:
+            print(f"AST cache read error: {str(e)}")
+            return None
+
+    def store(self, language: str, sha: bytes, parsed: Dict[str, Any]) -> bool:
+        """Store an extraction dict for this (language, hash) pair."""
+        try:
+            blob = pickle.dumps(parsed)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ast_cache (lang, hash, blob) VALUES (?, ?, ?)",
+                    (language, sha, blob)
+                )
+                self.conn.commit()
+            return True
+
+        except Exception as e:
+            print(f"AST cache write error: {str(e)}")
+            return False
+
+class ParseCache:
+    """
+    SQLite-backed cache of parse results keyed by (path, sha256(content)).
+
+    Re-running documentation over an unchanged folder is common during
+    iteration; caching the parsed structure (and the final per-file doc)
+    lets warm runs skip tree-sitter and the LLM entirely for files whose
+    bytes have not changed.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv("PARSE_CACHE_DB", "parse_cache.db")
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            "path TEXT, sha BLOB, parsed BLOB, doc BLOB, "
+            "PRIMARY KEY(path, sha))"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def content_sha(content) -> bytes:
+        """Compute the SHA-256 digest of file content (str or bytes)."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.sha256(content).digest()
+
+    def get(self, path: str, sha: bytes) -> Optional[Dict[str, Any]]:
+        """Look up a cache entry; returns {'parsed': ..., 'doc': ...} or None."""
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT parsed, doc FROM parse_cache WHERE path=? AND sha=?",
+                    (path, sha)
+                ).fetchone()
+
+            if not row:
+                return None
+
+            return {
+                'parsed': pickle.loads(row[0]) if row[0] is not None else None,
+                'doc': pickle.loads(row[1]) if row[1] is not None else None
+            }
+
+        except Exception as e:
+            print(f"Parse cache read error: {str(e)}")
+            return None
+
+    def store_parsed(self, path: str, sha: bytes, parsed: Dict[str, Any]) -> bool:
+        """Store a parse result, keeping any doc already cached for this key."""
+        try:
+            blob = pickle.dumps(parsed)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache (path, sha, parsed, doc) "
+                    "VALUES (?, ?, ?, "
+                    "(SELECT doc FROM parse_cache WHERE path=? AND sha=?))",
+                    (path, sha, blob, path, sha)
+                )
+                self.conn.commit()
+            return True
+
+        except Exception as e:
+            print(f"Parse cache write error: {str(e)}")
+            return False
+
+    def store_doc(self, path: str, sha: bytes, doc: Dict[str, Any]) -> bool:
+        """Store the generated documentation for an already-cached parse."""
+        try:
+            blob = pickle.dumps(doc)
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE parse_cache SET doc=? WHERE path=? AND sha=?",
+                    (blob, path, sha)
+                )
+                self.conn.commit()
+            return True
+
+        except Exception as e:
+            print(f"Parse cache write error: {str(e)}")
+            return False
@@ -1,187 +1,214 @@
-from typing import Dict, Any, List
-from tree_sitter import Language, Parser, Node
-import tree_sitter_java as ts_java
-from treesitter import TreeSitterBase
-
-class JavaParser(TreeSitterBase):
-    def __init__(self):
-        super().__init__()
-        self.language_name = "java"
-
-    def _initialize_parser(self) -> None:
-        """Initialize the parser with Java language."""
-        JAVA_LANGUAGE = Language(ts_java.language())
-        self.parser.set_language(JAVA_LANGUAGE)
-
-    def get_language_name(self) -> str:
-        return self.language_name
-
-    def parse_code(self, code_bytes: bytes) -> Dict[str, Any]:
-        """Parse Java code and extract relevant information."""
-        tree = self.parser.parse(code_bytes)
-        root_node = tree.root_node
-
-        return {
-            'imports': self._extract_imports(root_node),
-            'package': self._extract_package(root_node),
-            'classes': self._extract_classes(root_node),
-            'functions': self._extract_methods(root_node),
-            'interfaces': self._extract_interfaces(root_node)
-        }
-
-    def _extract_package(self, node: Node) -> str:
-        """Extract package declaration."""
-        for child in node.children:
-            if child.type == 'package_declaration':
-                return child.text.decode('utf-8')
-        return ''
-
-    def _extract_imports(self, node: Node) -> List[Dict[str, str]]:
-        """Extract import statements."""
-        imports = []
-        for child in node.children:
-            if child.type == 'import_declaration':
-                imports.append({
-                    'type': 'import',
-                    'text': child.text.decode('utf-8')
-                })
-        return imports
-
-    def _extract_methods(self, node: Node) -> List[Dict[str, Any]]:
-        """Extract method declarations."""
-        methods = []
-        
-        def visit_method(node):
-            if node.type == 'method_declaration':
-                name_node = None
-                for child in node.children:
-                    if child.type == 'identifier':
-                        name_node = child
-                        break
-
-                if name_node:
-                    method_info = {
-                        'name': name_node.text.decode('utf-8'),
-                        'source_code': node.text.decode('utf-8'),
-                        'doc_comment': self._extract_doc_comment(node),
-                        'start_point': node.start_point,
-                        'end_point': node.end_point,
-                        'parameters': self._extract_parameters(node),
-                        'return_type': self._extract_return_type(node)
-                    }
-                    methods.append(method_info)
-
-            for child in node.children:
-                visit_method(child)
-
-        visit_method(node)
-        return methods
-
-    def _extract_classes(self, node: Node) -> List[Dict[str, Any]]:
-        """Extract class declarations."""
-        classes = []
-        
-        def visit_class(node):
-            if node.type == 'class_declaration':
-                name_node = None
-                for child in node.children:
-                    if child.type == 'identifier':
-                        name_node = child
-                        break
-
-                if name_node:
-                    class_info = {
-                        'name': name_node.text.decode('utf-8'),
-                        'methods': self._extract_methods(node),
-                        'doc_comment': self._extract_doc_comment(node),
-                        'fields': self._extract_fields(node)
-                    }
-                    classes.append(class_info)
-
-            for child in node.children:
-                visit_class(child)
-
-        visit_class(node)
-        return classes
-
-    def _extract_interfaces(self, node: Node) -> List[Dict[str, Any]]:
-        """Extract interface declarations."""
-        interfaces = []
-        
-        def visit_interface(node):
-            if node.type == 'interface_declaration':
-                name_node = None
-                for child in node.children:
-                    if child.type == 'identifier':
-                        name_node = child
-                        break
-
-                if name_node:
-                    interface_info = {
-                        'name': name_node.text.decode('utf-8'),
-                        'methods': self._extract_methods(node),
-                        'doc_comment': self._extract_doc_comment(node)
-                    }
-                    interfaces.append(interface_info)
-
-            for child in node.children:
-                visit_interface(child)
-
-        visit_interface(node)
-        return interfaces
-
-    def _extract_doc_comment(self, node: Node) -> str:
-        """Extract Javadoc comment."""
-        prev_sibling = node.prev_sibling
-        if prev_sibling and prev_sibling.type == 'comment':
-            return prev_sibling.text.decode('utf-8')
-        return ''
-
-    def _extract_parameters(self, method_node: Node) -> List[Dict[str, str]]:
-        """Extract method parameters."""
-        parameters = []
-        for child in method_node.children:
-            if child.type == 'formal_parameters':
-                for param in child.children:
-                    if param.type == 'formal_parameter':
-                        param_type = None
-                        param_name = None
-                        for param_child in param.children:
-                            if param_child.type == 'type_identifier':
-                                param_type = param_child.text.decode('utf-8')
-                            elif param_child.type == 'identifier':
-                                param_name = param_child.text.decode('utf-8')
-                        if param_type and param_name:
-                            parameters.append({
-                                'type': param_type,
-                                'name': param_name
-                            })
-        return parameters
-
-    def _extract_return_type(self, method_node: Node) -> str:
-        """Extract method return type."""
-        for child in method_node.children:
-            if child.type in ['type_identifier', 'void_type']:
-                return child.text.decode('utf-8')
-        return 'void'
-
-    def _extract_fields(self, class_node: Node) -> List[Dict[str, str]]:
-        """Extract class fields."""
-        fields = []
-        for child in class_node.children:
-            if child.type == 'field_declaration':
-                field_type = None
-                field_name = None
-                for field_child in child.children:
-                    if field_child.type == 'type_identifier':
-                        field_type = field_child.text.decode('utf-8')
-                    elif field_child.type == 'variable_declarator':
-                        for var_child in field_child.children:
-                            if var_child.type == 'identifier':
-                                field_name = var_child.text.decode('utf-8')
-                if field_type and field_name:
-                    fields.append({
-                        'type': field_type,
-                        'name': field_name
-                    })
+from typing import Dict, Any, List
+from tree_sitter import Language, Parser, Node
+import tree_sitter_java as ts_java
+from treesitter import TreeSitterBase
+
+# One combined query matches every pattern we extract in the C query
+# engine; the anchored (comment . declaration) patterns pair each Javadoc
+# with its declaration during the same match pass
+_QUERY_SRC = """
+(method_declaration) @method
+(class_declaration) @class
+(interface_declaration) @interface
+(import_declaration) @import
+(package_declaration) @package
+((comment) @doc . (method_declaration) @doc.target)
+((comment) @doc . (class_declaration) @doc.target)
+((comment) @doc . (interface_declaration) @doc.target)
+"""
+
+# Compiled once per process, lazily so importing the module does not
+# require the grammar to load
+_JAVA_QUERY = None
+
+def _get_java_query():
+    global _JAVA_QUERY
+    if _JAVA_QUERY is None:
+        _JAVA_QUERY = Language(ts_java.language()).query(_QUERY_SRC)
+    return _JAVA_QUERY
+
+class JavaParser(TreeSitterBase):
+    def __init__(self):
+        super().__init__()
+        self.language_name = "java"
+
+    def _initialize_parser(self) -> None:
+        """Initialize the parser with Java language."""
+        JAVA_LANGUAGE = Language(ts_java.language())
+        self.parser.set_language(JAVA_LANGUAGE)
+
+    def get_language_name(self) -> str:
+        return self.language_name
+
+    def parse_code(self, code_bytes: bytes) -> Dict[str, Any]:
+        """Parse Java code and extract relevant information."""
+        # Keep the source buffer so node text can be sliced out of it
+        # instead of paying a C call + copy per node.text access
+        self._src = code_bytes
+        tree = self.parser.parse(code_bytes)
+
+        # The compiled query walks the tree in C; Python only buckets the
+        # captured nodes. Captures arrive in source order, so each @doc
+        # immediately precedes its anchored @doc.target
+        buckets: Dict[str, List[Node]] = {}
+        doc_by_id: Dict[int, Node] = {}
+        doc_node = None
+        for node, capture_name in _get_java_query().captures(tree.root_node):
+            if capture_name == 'doc':
+                doc_node = node
+            elif capture_name == 'doc.target':
+                if doc_node is not None:
+                    doc_by_id[node.id] = doc_node
+                    doc_node = None
+            else:
+                buckets.setdefault(capture_name, []).append(node)
+        self._doc_by_id = doc_by_id
+        method_nodes = buckets.get('method', [])
+
+        return {
+            'imports': self._extract_imports(buckets.get('import', [])),
+            'package': self._extract_package(buckets.get('package', [])),
+            'classes': self._extract_classes(buckets.get('class', []), method_nodes),
+            'functions': [self._build_method_info(node) for node in method_nodes],
+            'interfaces': self._extract_interfaces(buckets.get('interface', []), method_nodes)
+        }
+
+    def _txt(self, node: Node) -> str:
+        """Decode a node's text by slicing the original source buffer."""
+        return self._src[node.start_byte:node.end_byte].decode('utf-8', 'replace')
+
+    @staticmethod
+    def _contained_in(nodes: List[Node], container: Node) -> List[Node]:
+        """Pick the nodes whose byte range lies inside the container node."""
+        return [node for node in nodes
+                if node.start_byte >= container.start_byte and node.end_byte <= container.end_byte]
+
+    def _extract_package(self, package_nodes: List[Node]) -> str:
+        """Extract package declaration."""
+        for node in package_nodes:
+            return self._txt(node)
+        return ''
+
+    def _extract_imports(self, import_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract import statements."""
+        return [{
+            'type': 'import',
+            'text': self._txt(node)
+        } for node in import_nodes]
+
+    def _build_method_info(self, node: Node) -> Dict[str, Any]:
+        """Build the info dict for one method declaration node."""
+        name_node = None
+        for child in node.children:
+            if child.type == 'identifier':
+                name_node = child
+                break
+
+        return {
+            'name': self._txt(name_node) if name_node else '',
+            'source_code': self._txt(node),
+            'doc_comment': self._extract_doc_comment(node),
+            'start_point': node.start_point,
+            'end_point': node.end_point,
+            'parameters': self._extract_parameters(node),
+            'return_type': self._extract_return_type(node)
+        }
+
+    def _extract_classes(self, class_nodes: List[Node], method_nodes: List[Node]) -> List[Dict[str, Any]]:
+        """Extract class declarations."""
+        classes = []
+
+        for node in class_nodes:
+            name_node = None
+            for child in node.children:
+                if child.type == 'identifier':
+                    name_node = child
+                    break
+
+            if name_node:
+                classes.append({
+                    'name': self._txt(name_node),
+                    'methods': [self._build_method_info(m) for m in self._contained_in(method_nodes, node)],
+                    'doc_comment': self._extract_doc_comment(node),
+                    'fields': self._extract_fields(node)
+                })
+
+        return classes
+
+    def _extract_interfaces(self, interface_nodes: List[Node], method_nodes: List[Node]) -> List[Dict[str, Any]]:
+        """Extract interface declarations."""
+        interfaces = []
+
+        for node in interface_nodes:
+            name_node = None
+            for child in node.children:
+                if child.type == 'identifier':
+                    name_node = child
+                    break
+
+            if name_node:
+                interfaces.append({
+                    'name': self._txt(name_node),
+                    'methods': [self._build_method_info(m) for m in self._contained_in(method_nodes, node)],
+                    'doc_comment': self._extract_doc_comment(node)
+                })
+
+        return interfaces
+
+    def _extract_doc_comment(self, node: Node) -> str:
+        """Extract Javadoc comment."""
+        # The anchored query patterns paired each comment with the
+        # declaration that follows it; this is just the map lookup
+        doc_node = self._doc_by_id.get(node.id)
+        if doc_node is not None:
+            return self._txt(doc_node)
+        return ''
+
+    def _extract_parameters(self, method_node: Node) -> List[Dict[str, str]]:
+        """Extract method parameters."""
+        parameters = []
+        for child in method_node.children:
+            if child.type == 'formal_parameters':
+                for param in child.children:
+                    if param.type == 'formal_parameter':
+                        param_type = None
+                        param_name = None
+                        for param_child in param.children:
+                            if param_child.type == 'type_identifier':
+                                param_type = self._txt(param_child)
+                            elif param_child.type == 'identifier':
+                                param_name = self._txt(param_child)
+                        if param_type and param_name:
+                            parameters.append({
+                                'type': param_type,
+                                'name': param_name
+                            })
+        return parameters
+
+    def _extract_return_type(self, method_node: Node) -> str:
+        """Extract method return type."""
+        for child in method_node.children:
+            if child.type in ['type_identifier', 'void_type']:
+                return self._txt(child)
+        return 'void'
+
+    def _extract_fields(self, class_node: Node) -> List[Dict[str, str]]:
+        """Extract class fields."""
+        fields = []
+        for child in class_node.children:
+            if child.type == 'field_declaration':
+                field_type = None
+                field_name = None
+                for field_child in child.children:
+                    if field_child.type == 'type_identifier':
+                        field_type = self._txt(field_child)
+                    elif field_child.type == 'variable_declarator':
+                        for var_child in field_child.children:
+                            if var_child.type == 'identifier':
+                                field_name = self._txt(var_child)
+                if field_type and field_name:
+                    fields.append({
+                        'type': field_type,
+                        'name': field_name
+                    })
         return fields
\ No newline at end of file
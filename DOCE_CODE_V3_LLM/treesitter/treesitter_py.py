@@ -1,242 +1,510 @@
-#File for multilanguage parser which makes use of tree-sitter library to parse source code in multiple languages the treesitter_java.py 
-#file is just an example for java specific parser. The multilanguage parser is a class that can parse source code in multiple languages:
-# and not nly for java. The class has a constructor that takes a language as an argument and initializes the parser with the specified language.
-from typing import List, Dict, Any, Optional
-from tree_sitter import Language, Parser, Node
-import tree_sitter_python as ts_python
-import tree_sitter_java as ts_java
-import tree_sitter_cpp as ts_cpp
-import tree_sitter_c as tsc
-import tree_sitter_javascript as ts_javascript
-from constants import Language as LangType
-from tree_sitter import TSLanguage
-
-class TreesitterMethodNode:
-    def __init__(self, name: str, doc_comment: str, method_source_code: str, 
-                 start_line: int, end_line: int):
-        self.name = name
-        self.doc_comment = doc_comment
-        self.method_source_code = method_source_code
-        self.start_line = start_line
-        self.end_line = end_line
-
-class MultiLanguageParser:
-    LANGUAGE_CONFIGS = {
-        'python': {
-            'module': ts_python,
-            'method_identifier': 'def_statement',
-            'class_identifier': 'class',
-            'import_identifiers': ['import statement', 'from statement import list'],
-            'docstring_type': 'string',
-            'name_field': 'name',
-            'params_field': 'parameters'
-        },
-        'java': {
-            'module': ts_java,
-            'method_identifier': ['public void exampleMethod(){', 'public static void exampleMethod(){','private void exampleMethod(){'],
-            'class_identifier': 'public class Example {',
-            'import_identifiers': ['import Scanner', 'import java.util.Scanner', 'import java.util.*'],
-            'docstring_type': 'comment',
-            'name_field': 'name',
-            'params_field': 'formal_parameters'
-        },
-        'cpp': {
-            'module': ts_cpp,
-            'method_identifier': 'void function_name(){',
-            'class_identifier': 'class Example{',
-            'import_identifiers': ['#include <iostream>', '#include <vector>', '#include <string>'],
-            'docstring_type': 'comment',
-            'name_field': 'declarator',
-            'params_field': 'parameter_list'
-        },
-        'c': {
-            'module': tsc,
-            'method_identifier': 'void function_name(){',
-            'class_identifier': 'struct Example{',
-            'import_identifiers': ['#include <stdio.h>', '#include <stdlib.h>', '#include <string.h>'],
-            'docstring_type': 'comment',
-            'name_field': 'declarator',
-            'params_field': 'parameter_list'
-        },
-        'javascript': {
-            'module': ts_javascript,
-            'method_identifier': 'function exampleFunction(){',
-            'class_identifier': 'class declaration{',
-            'import_identifiers': ['import * as fs from "fs"', 'import * as path from "path"', 'import { example } from "./example"'],
-            'docstring_type': 'comment',
-            'name_field': 'name',
-            'params_field': 'formal_parameters'
-        }
-    }
-
-    def __init__(self, language: str):
-        self.language = language.lower()
-        if self.language not in self.LANGUAGE_CONFIGS:
-            raise ValueError(f"Unsupported language: {language}")
-        
-        self.config = self.LANGUAGE_CONFIGS[self.language]
-        self.parser = Parser()
-        self._initialize_parser(self.language)
-        
-#@pytest.mark.filterwarnings("ignore:The constructor for class 'Language' is deprecated:DeprecationWarning")
-    def _initialize_parser(self, language: str) -> None:
-        """Initialize the parser with the specified language."""
-        lang_module = self.config['module']
-        try:
-            self.parser.set_language(lang_module.language())
-        except Exception as e:
-            raise Exception(f"Failed to initialize parser for {language} language: {str(e)}")
-        
-    def parse(self, source_code: str) -> Dict[str, Any]:
-        """Parse source code and extract all relevant information."""
-        try:
-            tree = self.parser.parse(bytes(source_code, 'utf8'))
-            return {
-                'imports': self._extract_imports(tree.root_node),
-                'classes': self._extract_classes(tree.root_node),
-                'functions': self._extract_functions(tree.root_node),
-                'variables': self._extract_variables(tree.root_node)
-            }
-        except Exception as e:
-            raise Exception(f"Failed to parse {self.language} source code: {str(e)}")
-
-    def _extract_imports(self, node: Node) -> List[Dict[str, str]]:
-        """Extract import statements based on language-specific syntax."""
-        imports = []
-        
-        def visit_import(node):
-            if node.type in self.config['import_identifiers']:
-                imports.append({
-                    'type': node.type,
-                    'text': node.text.decode('utf-8')
-                })
-            for child in node.children:
-                visit_import(child)
-                
-        visit_import(node)
-        return imports
-
-    def _extract_functions(self, node: Node) -> List[TreesitterMethodNode]:
-        """Extract function/method definitions based on language-specific syntax."""
-        functions = []
-        
-        def visit_function(node):
-            if node.type == self.config['method_identifier']:
-                # The `child_by_field_name` method in the `tree-sitter` library is
-                # used to retrieve a specific child node of a given node based on the
-                # field name associated with that child node.
-                name_node = node.child_by_field_name(self.config['name_field'])
-                name = self._extract_name(name_node)
-                doc_comment = self._find_docstring(node)
-                source_code = node.text.decode('utf-8')
-                
-                functions.append(TreesitterMethodNode(
-                    name=name,
-                    doc_comment=doc_comment,
-                    method_source_code=source_code,
-                    start_line=node.start_point[0],
-                    end_line=node.end_point[0]
-                ))
-            
-            for child in node.children:
-                visit_function(child)
-                
-        visit_function(node)
-        return functions
-
-    def _extract_classes(self, node: Node) -> List[Dict[str, Any]]:
-        """Extract class definitions based on language-specific syntax."""
-        classes = []
-        
-        def visit_class(node):
-            if node.type == self.config['class_identifier']:
-                name_node = node.child_by_field_name(self.config['name_field'])
-                name = self._extract_name(name_node)
-                doc_comment = self._find_docstring(node)
-                
-                classes.append({
-                    'name': name,
-                    'docstring': doc_comment,
-                    'methods': self._extract_functions(node),
-                    'start_point': node.start_point,
-                    'end_point': node.end_point
-                })
-            
-            for child in node.children:
-                visit_class(child)
-                
-        visit_class(node)
-        return classes
-
-    def _extract_variables(self, node: Node) -> List[Dict[str, str]]:
-        """Extract variable declarations based on language-specific syntax."""
-        variables = []
-        
-        def visit_variable(node):
-            # Handle different variable declaration patterns based on language
-            if self.language in ['python']:
-                if node.type == 'assignment':
-                    left_node = node.child_by_field_name('left')
-                    right_node = node.child_by_field_name('right')
-                    if left_node and right_node:
-                        variables.append({
-                            'name': left_node.text.decode('utf-8'),
-                            'value': right_node.text.decode('utf-8')
-                        })
-            elif self.language in ['java', 'cpp', 'c']:
-                if node.type == 'declaration':
-                    name_node = node.child_by_field_name('declarator')
-                    if name_node:
-                        variables.append({
-                            'name': name_node.text.decode('utf-8'),
-                            'type': node.child_by_field_name('type').text.decode('utf-8') if node.child_by_field_name('type') else ''
-                        })
-            elif self.language == 'javascript':
-                if node.type in ['variable_declaration', 'lexical_declaration']:
-                    for declarator in node.children:
-                        if declarator.type == 'variable_declarator':
-                            name_node = declarator.child_by_field_name('name')
-                            value_node = declarator.child_by_field_name('value')
-                            if name_node:
-                                variables.append({
-                                    'name': name_node.text.decode('utf-8'),
-                                    'value': value_node.text.decode('utf-8') if value_node else ''
-                                })
-            
-            for child in node.children:
-                visit_variable(child)
-                
-        visit_variable(node)
-        return variables
-
-    def _find_docstring(self, node: Node) -> str:
-        """Extract documentation based on language-specific conventions."""
-        # Handle Python-style doc_strings
-        if self.language == 'python':
-            for child in node.children:
-                if child.type == 'expression_statement':
-                    string_node = child.children[0]
-                    if string_node.type == 'string':
-                        return string_node.text.decode('utf-8')
-        
-        # Handle comment-style documentation
-        prev_sibling = node.prev_named_sibling
-        if prev_sibling and prev_sibling.type == self.config['docstring_type']:
-            return prev_sibling.text.decode('utf-8')
-        
-        return ''
-
-    def _extract_name(self, node: Node) -> str:
-        """Extract name from a node based on language-specific patterns."""
-        if not node:
-            return ''
-            
-        if self.language in ['cpp', 'c']:
-            # Handle complex C/C++ function declarators
-            if node.type == 'function_declarator':
-                for child in node.children:
-                    if child.type == 'identifier':
-                        return child.text.decode('utf-8')
-            return node.text.decode('utf-8')
-        
-        return node.text.decode('utf-8')
\ No newline at end of file
+#File for multilanguage parser which makes use of tree-sitter library to parse source code in multiple languages the treesitter_java.py 
+#file is just an example for java specific parser. The multilanguage parser is a class that can parse source code in multiple languages:
+# and not nly for java. The class has a constructor that takes a language as an argument and initializes the parser with the specified language.
+import hashlib
+import mmap
+import threading
+from array import array
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+from tree_sitter import Language, Parser, Node
+import tree_sitter_python as ts_python
+import tree_sitter_java as ts_java
+import tree_sitter_cpp as ts_cpp
+import tree_sitter_c as tsc
+import tree_sitter_javascript as ts_javascript
+from treesitter.parse_cache import AstCache
+
+# Shared cache of extraction results keyed by (language, sha256(code)),
+# created lazily so importing the parser never touches the database
+_ast_cache = None
+
+def _get_ast_cache() -> AstCache:
+    global _ast_cache
+    if _ast_cache is None:
+        _ast_cache = AstCache()
+    return _ast_cache
+
+# Grammar objects are immutable, so each language is loaded exactly once
+# per process
+_languages: Dict[str, Any] = {}
+
+def _get_language(language: str) -> Language:
+    lang = _languages.get(language)
+    if lang is None:
+        lang_module = MultiLanguageParser.LANGUAGE_CONFIGS[language].module
+        lang = _languages[language] = Language(lang_module.language())
+    return lang
+
+# One Parser per (language, thread), reused across files via reset();
+# Parser objects are cheap to keep but not safe to share between threads
+_thread_parsers = threading.local()
+
+def _get_parser(language: str) -> Parser:
+    parsers = getattr(_thread_parsers, 'by_language', None)
+    if parsers is None:
+        parsers = _thread_parsers.by_language = {}
+    parser = parsers.get(language)
+    if parser is None:
+        parser = Parser()
+        try:
+            parser.set_language(_get_language(language))
+        except Exception as e:
+            raise Exception(f"Failed to initialize parser for {language} language: {str(e)}")
+        parsers[language] = parser
+    return parser
+
+def _match_comments(decl_starts, comment_ends):
+    """
+    For each declaration start line, find the index of the comment whose
+    last line sits directly above it, or -1 when there is none.
+
+    Both arrays must be sorted ascending; a single two-pointer sweep then
+    matches every declaration in O(D + C) over C-packed ints.
+    """
+    matched = array('i', [-1] * len(decl_starts))
+    m = len(comment_ends)
+    j = 0
+    for i, start in enumerate(decl_starts):
+        target = start - 1
+        while j < m and comment_ends[j] < target:
+            j += 1
+        if j < m and comment_ends[j] == target:
+            matched[i] = j
+    return matched
+
+# Pooled MultiLanguageParser instances, one per (language, thread).
+# Instances carry per-parse scratch state (_src, _prev_named), so they are
+# reused across files but never shared between threads; a process-global
+# lru_cache would hand the same instance to concurrent workers
+_instances = threading.local()
+
+def get_parser(language: str) -> 'MultiLanguageParser':
+    """Return this thread's MultiLanguageParser for a language, creating it lazily."""
+    instances = getattr(_instances, 'by_language', None)
+    if instances is None:
+        instances = _instances.by_language = {}
+    instance = instances.get(language)
+    if instance is None:
+        instance = instances[language] = MultiLanguageParser(language)
+    return instance
+
+# Per-language grammar configuration, frozen as a namedtuple so config
+# reads in the extractors are attribute loads instead of dict lookups
+LanguageConfig = namedtuple('LanguageConfig', [
+    'module', 'method_identifier', 'class_identifier', 'import_identifiers',
+    'variable_identifiers', 'docstring_type', 'name_field', 'class_name_field',
+    'params_field'
+])
+
+# slots=True drops the per-instance __dict__, which matters when a large
+# repo yields one of these per extracted function; orjson still serializes
+# it natively as a dataclass
+@dataclass(slots=True)
+class TreesitterMethodNode:
+    name: str
+    doc_comment: str
+    method_source_code: str
+    start_line: int
+    end_line: int
+
+class MultiLanguageParser:
+    # Identifiers are real grammar node kinds (see each grammar's
+    # node-types.json); earlier revisions held literal source snippets
+    # here, which never equal a node.type, so the Java/C/C++/JS paths
+    # silently matched nothing
+    LANGUAGE_CONFIGS = {
+        'python': LanguageConfig(
+            module=ts_python,
+            method_identifier='function_definition',
+            class_identifier='class_definition',
+            import_identifiers=['import_statement', 'import_from_statement'],
+            variable_identifiers=['assignment'],
+            docstring_type='string',
+            name_field='name',
+            class_name_field='name',
+            params_field='parameters'
+        ),
+        'java': LanguageConfig(
+            module=ts_java,
+            method_identifier=['method_declaration', 'constructor_declaration'],
+            class_identifier='class_declaration',
+            import_identifiers=['import_declaration'],
+            variable_identifiers=['local_variable_declaration', 'field_declaration'],
+            docstring_type='comment',
+            name_field='name',
+            class_name_field='name',
+            params_field='formal_parameters'
+        ),
+        'cpp': LanguageConfig(
+            module=ts_cpp,
+            method_identifier='function_definition',
+            class_identifier='class_specifier',
+            import_identifiers=['preproc_include'],
+            variable_identifiers=['declaration'],
+            docstring_type='comment',
+            name_field='declarator',
+            class_name_field='name',
+            params_field='parameter_list'
+        ),
+        'c': LanguageConfig(
+            module=tsc,
+            method_identifier='function_definition',
+            class_identifier='struct_specifier',
+            import_identifiers=['preproc_include'],
+            variable_identifiers=['declaration'],
+            docstring_type='comment',
+            name_field='declarator',
+            class_name_field='name',
+            params_field='parameter_list'
+        ),
+        'javascript': LanguageConfig(
+            module=ts_javascript,
+            method_identifier=['function_declaration', 'method_definition'],
+            class_identifier='class_declaration',
+            import_identifiers=['import_statement'],
+            variable_identifiers=['variable_declaration', 'lexical_declaration'],
+            docstring_type='comment',
+            name_field='name',
+            class_name_field='name',
+            params_field='formal_parameters'
+        )
+    }
+
+    def __init__(self, language: str):
+        self.language = language.lower()
+        if self.language not in self.LANGUAGE_CONFIGS:
+            raise ValueError(f"Unsupported language: {language}")
+
+        self.config = self.LANGUAGE_CONFIGS[self.language]
+
+        # Node kinds resolved to integer ids once per instance; the
+        # traversal dispatches on node.kind_id so the hot loop does set
+        # membership on ints instead of string compares
+        lang_obj = _get_language(self.language)
+        self._method_ids = self._kind_ids(lang_obj, self.config.method_identifier)
+        self._class_ids = self._kind_ids(lang_obj, self.config.class_identifier)
+        self._import_ids = self._kind_ids(lang_obj, self.config.import_identifiers)
+        self._variable_ids = self._kind_ids(lang_obj, self.config.variable_identifiers)
+
+        # Comment-documented languages pair each declaration with the
+        # comment ending on the line above it via the adjacency kernel;
+        # Python keeps its docstring/sibling lookup instead
+        self._comment_id = (lang_obj.id_for_node_kind('comment', True)
+                            if self.config.docstring_type == 'comment' else None)
+
+        # Hot-path config values hoisted onto the instance once, so the
+        # extractors do plain attribute loads instead of going through
+        # self.config on every node
+        self._name_field = self.config.name_field
+        # Class-like nodes expose their name under 'name' even in C/C++,
+        # where methods use the 'declarator' field
+        self._class_name_field = self.config.class_name_field
+        self._docstring_type = self.config.docstring_type
+
+        # Variable extraction differs per language; bind the matching
+        # extractor once here instead of re-testing self.language per parse
+        self._var_extractor = {
+            'python': self._extract_var_python,
+            'java': self._extract_var_cstyle,
+            'cpp': self._extract_var_cstyle,
+            'c': self._extract_var_cstyle,
+            'javascript': self._extract_var_js
+        }[self.language]
+
+    @property
+    def parser(self) -> Parser:
+        """This thread's shared Parser for the configured language."""
+        return _get_parser(self.language)
+
+    def parse(self, source_code: "bytes | str", use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Parse source code and extract all relevant information.
+
+        bytes (including bytearray/memoryview/mmap) go straight to
+        tree-sitter; str is encoded once, so binary-mode readers pay no
+        encode/decode round-trip on the file contents.
+
+        use_cache=False skips the shared AstCache for callers that already
+        cache extractions under their own key (the flask pipeline stores
+        them by (path, sha) in ParseCache), so a cold parse is not hashed
+        and pickled into two SQLite databases.
+        """
+        try:
+            if isinstance(source_code, (bytes, bytearray, memoryview, mmap.mmap)):
+                data = source_code
+            else:
+                data = bytes(source_code, 'utf8')
+
+            # Keep the source buffer so node text can be sliced out of it
+            # instead of paying a C call + copy per node.text access
+            self._src = data
+
+            sha = None
+            if use_cache:
+                # Unchanged bytes parse to the same extraction; serve it
+                # from the AST cache for the cost of a hash and one SELECT
+                sha = hashlib.sha256(data).digest()
+                cached = _get_ast_cache().get(self.language, sha)
+                if cached is not None:
+                    return cached
+
+            parser = _get_parser(self.language)
+            parser.reset()
+            tree = parser.parse(data)
+            # One cursor traversal buckets the interesting nodes; the
+            # extractors below just read their buckets
+            (method_nodes, class_nodes, import_nodes,
+             variable_nodes, comment_nodes) = self._collect(tree.root_node)
+            self._line_docs = (self._attach_comments(method_nodes + class_nodes, comment_nodes)
+                               if self._comment_id is not None else {})
+            result = {
+                'imports': self._extract_imports(import_nodes),
+                'classes': self._extract_classes(class_nodes, method_nodes),
+                'functions': self._extract_functions(method_nodes),
+                'variables': self._extract_variables(variable_nodes)
+            }
+            if use_cache:
+                _get_ast_cache().store(self.language, sha, result)
+            return result
+        except Exception as e:
+            raise Exception(f"Failed to parse {self.language} source code: {str(e)}")
+
+    @staticmethod
+    def _kind_ids(lang_obj: Language, kinds) -> frozenset:
+        """Resolve configured node kind names to integer kind ids."""
+        if isinstance(kinds, str):
+            kinds = [kinds]
+        return frozenset(lang_obj.id_for_node_kind(kind, True) for kind in kinds)
+
+    def _collect(self, root_node: Node):
+        """
+        Bucket method/class/import/variable nodes in one cursor traversal,
+        dispatching on node.kind_id against the precomputed id sets.
+        """
+        method_nodes: List[Node] = []
+        class_nodes: List[Node] = []
+        import_nodes: List[Node] = []
+        variable_nodes: List[Node] = []
+        comment_nodes: List[Node] = []
+        comment_id = self._comment_id
+        method_ids = self._method_ids
+        class_ids = self._class_ids
+        import_ids = self._import_ids
+        variable_ids = self._variable_ids
+
+        # Nearest preceding named sibling of each method/class node, noted
+        # while the cursor passes it; prev_named_sibling would otherwise
+        # rescan the parent's child list per lookup
+        prev_named_by_id: Dict[int, Node] = {}
+        self._prev_named = prev_named_by_id
+        prev_named = None
+        prev_stack: List[Optional[Node]] = []
+
+        # Bound locals keep the per-node dispatch to LOAD_FAST + call
+        add_method = method_nodes.append
+        add_class = class_nodes.append
+        add_import = import_nodes.append
+        add_variable = variable_nodes.append
+        add_comment = comment_nodes.append
+        push_level = prev_stack.append
+        pop_level = prev_stack.pop
+
+        cursor = root_node.walk()
+        goto_first_child = cursor.goto_first_child
+        goto_next_sibling = cursor.goto_next_sibling
+        goto_parent = cursor.goto_parent
+
+        while True:
+            node = cursor.node
+            kind_id = node.kind_id
+            if kind_id in method_ids:
+                add_method(node)
+                if prev_named is not None:
+                    prev_named_by_id[node.id] = prev_named
+            elif kind_id in class_ids:
+                add_class(node)
+                if prev_named is not None:
+                    prev_named_by_id[node.id] = prev_named
+            elif kind_id in import_ids:
+                add_import(node)
+            elif kind_id in variable_ids:
+                add_variable(node)
+            elif kind_id == comment_id:
+                add_comment(node)
+
+            if goto_first_child():
+                # On the way back out of this subtree, this node (if named)
+                # becomes the previous named sibling at its level again
+                push_level(node if node.is_named else prev_named)
+                prev_named = None
+                continue
+            if node.is_named:
+                prev_named = node
+            while not goto_next_sibling():
+                if not goto_parent():
+                    return (method_nodes, class_nodes, import_nodes,
+                            variable_nodes, comment_nodes)
+                prev_named = pop_level()
+
+    def _attach_comments(self, decl_nodes: List[Node], comment_nodes: List[Node]) -> Dict[int, Node]:
+        """Pair each declaration with the comment ending on the line above it."""
+        if not decl_nodes or not comment_nodes:
+            return {}
+        # Comments arrive in source order from the traversal; declarations
+        # are re-sorted since methods and classes came from separate buckets
+        decl_nodes = sorted(decl_nodes, key=lambda n: n.start_point[0])
+        decl_starts = array('i', [n.start_point[0] for n in decl_nodes])
+        comment_ends = array('i', [n.end_point[0] for n in comment_nodes])
+        matched = _match_comments(decl_starts, comment_ends)
+        return {decl_nodes[i].id: comment_nodes[j]
+                for i, j in enumerate(matched) if j >= 0}
+
+    def _txt(self, node: Node) -> str:
+        """Decode a node's text by slicing the original source buffer."""
+        return bytes(self._src[node.start_byte:node.end_byte]).decode('utf-8', 'replace')
+
+    def _extract_imports(self, import_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract import statements based on language-specific syntax."""
+        return [{
+            'type': node.type,
+            'text': self._txt(node)
+        } for node in import_nodes]
+
+    def _extract_functions(self, method_nodes: List[Node]) -> List[TreesitterMethodNode]:
+        """Extract function/method definitions based on language-specific syntax."""
+        functions = []
+        name_field = self._name_field
+
+        for node in method_nodes:
+            # The `child_by_field_name` method in the `tree-sitter` library is
+            # used to retrieve a specific child node of a given node based on the
+            # field name associated with that child node.
+            name_node = node.child_by_field_name(name_field)
+            name = self._extract_name(name_node)
+            doc_comment = self._find_docstring(node)
+            source_code = self._txt(node)
+
+            functions.append(TreesitterMethodNode(
+                name=name,
+                doc_comment=doc_comment,
+                method_source_code=source_code,
+                start_line=node.start_point[0],
+                end_line=node.end_point[0]
+            ))
+
+        return functions
+
+    def _extract_classes(self, class_nodes: List[Node], method_nodes: List[Node]) -> List[Dict[str, Any]]:
+        """Extract class definitions based on language-specific syntax."""
+        classes = []
+
+        class_name_field = self._class_name_field
+        for node in class_nodes:
+            # class_specifier/struct_specifier also match bare type
+            # references like 'struct Foo x;'; only definitions carry a
+            # body child
+            if node.child_by_field_name('body') is None:
+                continue
+            name_node = node.child_by_field_name(class_name_field)
+            name = self._extract_name(name_node)
+            doc_comment = self._find_docstring(node)
+
+            # Methods were collected in the same traversal; byte-range
+            # containment picks out the ones inside this class
+            class_methods = [m for m in method_nodes
+                             if m.start_byte >= node.start_byte and m.end_byte <= node.end_byte]
+
+            classes.append({
+                'name': name,
+                'docstring': doc_comment,
+                'methods': self._extract_functions(class_methods),
+                'start_point': node.start_point,
+                'end_point': node.end_point
+            })
+
+        return classes
+
+    def _extract_variables(self, variable_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract variable declarations via the extractor bound in __init__."""
+        return self._var_extractor(variable_nodes)
+
+    def _extract_var_python(self, variable_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract assignments: name and value."""
+        variables = []
+        for node in variable_nodes:
+            left_node = node.child_by_field_name('left')
+            right_node = node.child_by_field_name('right')
+            if left_node and right_node:
+                variables.append({
+                    'name': self._txt(left_node),
+                    'value': self._txt(right_node)
+                })
+        return variables
+
+    def _extract_var_cstyle(self, variable_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract typed declarations (Java/C/C++): name and type."""
+        variables = []
+        for node in variable_nodes:
+            name_node = node.child_by_field_name('declarator')
+            if name_node:
+                type_node = node.child_by_field_name('type')
+                variables.append({
+                    'name': self._txt(name_node),
+                    'type': self._txt(type_node) if type_node else ''
+                })
+        return variables
+
+    def _extract_var_js(self, variable_nodes: List[Node]) -> List[Dict[str, str]]:
+        """Extract var/let/const declarators: name and value."""
+        variables = []
+        for node in variable_nodes:
+            for declarator in node.children:
+                if declarator.type == 'variable_declarator':
+                    name_node = declarator.child_by_field_name('name')
+                    value_node = declarator.child_by_field_name('value')
+                    if name_node:
+                        variables.append({
+                            'name': self._txt(name_node),
+                            'value': self._txt(value_node) if value_node else ''
+                        })
+        return variables
+
+    def _find_docstring(self, node: Node) -> str:
+        """Extract documentation based on language-specific conventions."""
+        # Handle Python-style doc_strings
+        if self.language == 'python':
+            for child in node.children:
+                if child.type == 'expression_statement':
+                    string_node = child.children[0]
+                    if string_node.type == 'string':
+                        return self._txt(string_node)
+
+            # Preceding string sibling, indexed during the traversal
+            prev_sibling = self._prev_named.get(node.id)
+            if prev_sibling is not None and prev_sibling.type == self._docstring_type:
+                return self._txt(prev_sibling)
+            return ''
+
+        # Comment-style documentation: the adjacency pass paired this
+        # declaration with the comment ending just above it, if any
+        doc_node = self._line_docs.get(node.id)
+        if doc_node is not None:
+            return self._txt(doc_node)
+        return ''
+
+    def _extract_name(self, node: Node) -> str:
+        """Extract name from a node based on language-specific patterns."""
+        if not node:
+            return ''
+            
+        if self.language in ['cpp', 'c']:
+            # Handle complex C/C++ function declarators
+            if node.type == 'function_declarator':
+                for child in node.children:
+                    if child.type == 'identifier':
+                        return self._txt(child)
+            return self._txt(node)
+        
+        return self._txt(node)
\ No newline at end of file
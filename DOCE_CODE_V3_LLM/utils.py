@@ -1,172 +1,303 @@
-from typing import Dict, Any, List, Optional
-import os
-import json
-from tree_sitter import Parser, Language
-from datetime import datetime
-from pathlib import Path
-
-class CodeUtils:
-    @staticmethod
-    def parse_code(content: str, language: Optional[str] = None) -> Dict[str, Any]:
-        """
-        Parse code content and extract structural information.
-
-        Args:
-            content (str): Source code content
-            language (Optional[str]): Programming language identifier
-
-        Returns:
-            Dict[str, Any]: Parsed code structure
-        """
-        if not language:
-            language = CodeUtils.detect_language(content)
-
-        try:
-            # Convert content to proper encoding
-            if isinstance(content, str):
-                content = content.encode('utf-8')
-
-            return {
-                'content': content.decode('utf-8'),
-                'language': language,
-                'size': len(content)
-            }
-        except Exception as e:
-            return {
-                'error': f"Failed to parse code: {str(e)}",
-                'language': language
-            }
-
-    @staticmethod
-    def get_language_name(file_path: str) -> Optional[str]:
-        """
-        Determine programming language from file extension.
-
-        Args:
-            file_path (str): Path to source code file
-
-        Returns:
-            Optional[str]: Language identifier or None if unsupported
-        """
-        extension_map = {
-            '.py': 'python',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.js': 'javascript',
-            '.ts': 'typescript'
-        }
-
-        ext = Path(file_path).suffix.lower()
-        return extension_map.get(ext)
-
-    @staticmethod
-    def detect_language(content: str) -> Optional[str]:
-        """
-        Attempt to detect programming language from code content.
-
-        Args:
-            content (str): Source code content
-
-        Returns:
-            Optional[str]: Detected language or None
-        """
-        # Simple heuristic-based detection
-        indicators = {
-            'python': ['def ', 'import ', 'class ', '#!.*python'],
-            'java': ['public class', 'private class', 'protected class'],
-            'cpp': ['#include <', 'using namespace', 'std::'],
-            'c': ['#include <stdio.h>', 'int main(']
-        }
-
-        content_sample = content[:1000].lower()  # Check first 1000 chars
-
-        for lang, patterns in indicators.items():
-            if any(pattern.lower() in content_sample for pattern in patterns):
-                return lang
-
-        return None
-
-    @staticmethod
-    def save_documentation(docs: Dict[str, Any], output_path: str) -> bool:
-        """
-        Save generated documentation to file.
-
-        Args:
-            docs (Dict[str, Any]): Documentation data
-            output_path (str): Path to save output
-
-        Returns:
-            bool: Success status
-        """
-        try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(docs, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"Error saving documentation: {str(e)}")
-            return False
-        
-    @staticmethod
-    def get_language_name(self, file_path: str) -> str:
-           """
-           Get the programming language name based on the file extension.
-    
-           Args:
-               file_path (str): Path to the source code file
-    
-           Returns:
-               str: Programming language name
-           """
-           _, ext = os.path.splitext(file_path)
-           ext = ext.lower()
-    
-           # Mapping of file extensions to language names
-           extension_to_language = {
-               '.py': 'python',
-               '.js': 'javascript',
-               '.java': 'java',
-               '.cpp': 'cpp',
-               '.c': 'c',
-               '.cs': 'csharp',
-               '.rb': 'ruby',
-               '.go': 'go',
-               '.php': 'php',
-               '.html': 'html',
-               '.css': 'css',
-               # Add more mappings as needed
-           }
-    
-           return extension_to_language.get(ext, 'unknown')
-
-    @staticmethod
-    def format_documentation(docs: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Format documentation into a standardized structure.
-
-        Args:
-            docs (Dict[str, Any]): Raw documentation data
-
-        Returns:
-            Dict[str, Any]: Formatted documentation
-        """
-        formatted = {
-            'metadata': {
-                'generated_at': str(datetime.now()),
-                'version': '1.0'
-            },
-            'files': {}
-        }
-
-        for file_path, file_docs in docs.items():
-            if file_docs.get('status') == 'success':
-                formatted['files'][file_path] = {
-                    'language': file_docs.get('language', 'unknown'),
-                    'documentation': file_docs.get('documentation', {}),
-                    'similar_patterns': file_docs.get('similar_patterns', [])
-                }
-
+from typing import Dict, Any, List, Optional
+import os
+import re
+import threading
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from tree_sitter import Parser, Language
+from datetime import datetime, timezone
+
+# Heuristic substring indicators for language detection; the Python
+# shebang is handled separately in detect_language since '#!.*python'
+# was a regex pattern that never matched as a literal
+_LANGUAGE_INDICATORS = {
+    'python': ['def ', 'import ', 'class '],
+    'java': ['public class', 'private class', 'protected class'],
+    'cpp': ['#include <', 'using namespace', 'std::'],
+    'c': ['#include <stdio.h>', 'int main(']
+}
+
+# With pyahocorasick available, all indicators are matched in one linear
+# automaton scan instead of one str.find per pattern
+try:
+    import ahocorasick
+
+    _LANGUAGE_AUTOMATON = ahocorasick.Automaton()
+    for _lang, _patterns in _LANGUAGE_INDICATORS.items():
+        for _pattern in _patterns:
+            _LANGUAGE_AUTOMATON.add_word(_pattern.lower(), _lang)
+    _LANGUAGE_AUTOMATON.make_automaton()
+except ImportError:
+    _LANGUAGE_AUTOMATON = None
+
+# Hyperscan compiles the same literals into a SIMD block-mode database
+# scanned in one pass; when installed it sits above the Aho-Corasick and
+# naive fallbacks. Patterns are regexes to hyperscan, so literals are
+# escaped, and HS_FLAG_CASELESS replaces the case fold
+try:
+    import hyperscan
+
+    _HS_LANGS = []
+    _hs_patterns = []
+    for _lang, _patterns in _LANGUAGE_INDICATORS.items():
+        for _pattern in _patterns:
+            _HS_LANGS.append(_lang)
+            _hs_patterns.append(re.escape(_pattern).encode())
+
+    _HYPERSCAN_DB = hyperscan.Database()
+    _HYPERSCAN_DB.compile(
+        expressions=_hs_patterns,
+        ids=list(range(len(_hs_patterns))),
+        flags=[hyperscan.HS_FLAG_CASELESS] * len(_hs_patterns)
+    )
+except ImportError:
+    _HYPERSCAN_DB = None
+
+# Built once at import time; get_language_name runs once per file in a
+# batch, so no per-call dict construction
+_EXT_TO_LANG = {
+    '.py': 'python',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.js': 'javascript',
+    '.ts': 'typescript'
+}
+
+# Directories already ensured by save_documentation; a batch emitting N
+# files into one folder pays the makedirs stat once instead of N times
+_ENSURED_DIRS: set = set()
+_ensured_dirs_lock = threading.Lock()
+
+def _json_default(obj):
+    """Serialize objects orjson has no native encoding for (method nodes)."""
+    if hasattr(obj, '__dict__'):
+        return vars(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _parse_one(file_path: str) -> Dict[str, Any]:
+    """
+    Worker for parse_many: read one file, detect its language and extract.
+
+    Top-level so ProcessPoolExecutor can pickle it; each worker process
+    builds its own parsers lazily through MultiLanguageParser.
+    """
+    # Imported here so utils stays importable without the tree-sitter
+    # grammars installed
+    from treesitter.treesitter_py import get_parser
+
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+
+        language = CodeUtils.detect_language(content[:1000].decode('utf-8', 'replace'))
+        if not language:
+            return {'error': f"Could not detect language for {file_path}", 'language': None}
+
+        # The pooled per-language instance is reused across this worker's
+        # tasks instead of re-resolving kind ids for every file
+        parsed = get_parser(language).parse(content)
+        parsed['language'] = language
+        return parsed
+
+    except Exception as e:
+        return {'error': f"Failed to parse {file_path}: {str(e)}", 'language': None}
+
+class CodeUtils:
+    @staticmethod
+    def parse_code(content: "bytes | str", language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse code content and extract structural information.
+
+        Args:
+            content (bytes | str): Source code content; bytes from files
+                opened in 'rb' mode flow through without re-encoding
+            language (Optional[str]): Programming language identifier
+
+        Returns:
+            Dict[str, Any]: Parsed code structure
+        """
+        try:
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+
+            if not language:
+                # Only a 1 KB sample is decoded for detection; the content
+                # itself stays bytes end to end
+                language = CodeUtils.detect_language(content[:1000].decode('utf-8', 'replace'))
+
+            return {
+                'content_bytes': content,
+                'language': language,
+                'size': len(content)
+            }
+        except Exception as e:
+            return {
+                'error': f"Failed to parse code: {str(e)}",
+                'language': language
+            }
+
+    @staticmethod
+    def parse_many(paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse many files in parallel across processes.
+
+        Parsing plus extraction is CPU-bound, so a process pool sidesteps
+        the GIL and scales with cores; chunked map amortizes the IPC cost.
+
+        Args:
+            paths (List[str]): Source files to parse
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Extraction dict (or error dict) per path
+        """
+        if not paths:
+            return {}
+
+        ncpu = os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (ncpu * 4))
+
+        with ProcessPoolExecutor(max_workers=ncpu) as executor:
+            results = executor.map(_parse_one, paths, chunksize=chunksize)
+            return dict(zip(paths, results))
+
+    @staticmethod
+    def get_language_name(file_path: str) -> Optional[str]:
+        """
+        Determine programming language from file extension.
+
+        Args:
+            file_path (str): Path to source code file
+
+        Returns:
+            Optional[str]: Language identifier or None if unsupported
+        """
+        # os.path.splitext avoids constructing a Path object per call
+        ext = os.path.splitext(file_path)[1].lower()
+        return _EXT_TO_LANG.get(ext)
+
+    @staticmethod
+    def detect_language(content: str) -> Optional[str]:
+        """
+        Attempt to detect programming language from code content.
+
+        Args:
+            content (str): Source code content
+
+        Returns:
+            Optional[str]: Detected language or None
+        """
+        # Fast path: the first few bytes usually decide the language, so
+        # check a tiny prefix before copying and case-folding a 1 KB sample
+        head = content[:80]
+        if head.startswith('#!'):
+            if 'python' in head:
+                return 'python'
+        elif head.startswith('package ') or head.startswith('import java.'):
+            return 'java'
+        elif head.startswith('#include'):
+            return 'c' if 'stdio.h' in content[:200] else 'cpp'
+
+        if _HYPERSCAN_DB is not None:
+            # First hit across all literals in one SIMD scan; returning
+            # True from the handler stops the scan at that hit
+            matched: List[int] = []
+
+            def on_match(pattern_id, start, end, flags, context=None):
+                matched.append(pattern_id)
+                return True
+
+            try:
+                _HYPERSCAN_DB.scan(content[:1000].encode('utf-8', 'replace'),
+                                   match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass
+            if matched:
+                return _HS_LANGS[matched[0]]
+            return None
+
+        content_sample = content[:1000].casefold()  # Check first 1000 chars
+
+        if _LANGUAGE_AUTOMATON is not None:
+            # One automaton pass over the sample covers every indicator
+            for _, lang in _LANGUAGE_AUTOMATON.iter(content_sample):
+                return lang
+            return None
+
+        # Fallback when pyahocorasick is not installed
+        for lang, patterns in _LANGUAGE_INDICATORS.items():
+            if any(pattern in content_sample for pattern in patterns):
+                return lang
+
+        return None
+
+    @staticmethod
+    def save_documentation(docs: Dict[str, Any], output_path: str) -> bool:
+        """
+        Save generated documentation to file.
+
+        Args:
+            docs (Dict[str, Any]): Documentation data
+            output_path (str): Path to save output
+
+        Returns:
+            bool: Success status
+        """
+        try:
+            parent = os.path.dirname(output_path)
+            if parent and parent not in _ENSURED_DIRS:
+                # makedirs with exist_ok is already race-safe; the lock only
+                # keeps the set itself consistent across writer threads
+                os.makedirs(parent, exist_ok=True)
+                with _ensured_dirs_lock:
+                    _ENSURED_DIRS.add(parent)
+            # orjson encodes in C and writes one bytes buffer; datetimes and
+            # dataclasses are handled natively, method nodes via the default hook
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    docs,
+                    default=_json_default,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+            return True
+        except Exception as e:
+            print(f"Error saving documentation: {str(e)}")
+            return False
+        
+    @staticmethod
+    def format_documentation(docs: Dict[str, Any],
+                             generated_at: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Format documentation into a standardized structure.
+
+        Args:
+            docs (Dict[str, Any]): Raw documentation data
+            generated_at (Optional[str]): Timestamp to stamp into the
+                metadata; batch callers pass one value so every file in a
+                run shares it. Defaults to the current UTC time.
+
+        Returns:
+            Dict[str, Any]: Formatted documentation
+        """
+        if generated_at is None:
+            generated_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        formatted = {
+            'metadata': {
+                'generated_at': generated_at,
+                'version': '1.0'
+            },
+            'files': {}
+        }
+
+        for file_path, file_docs in docs.items():
+            if file_docs.get('status') == 'success':
+                formatted['files'][file_path] = {
+                    'language': file_docs.get('language', 'unknown'),
+                    'documentation': file_docs.get('documentation', {}),
+                    'similar_patterns': file_docs.get('similar_patterns', [])
+                }
+
         return formatted
\ No newline at end of file